@@ -1,68 +1,249 @@
+import asyncio
+import json
 import os
+import random
 import threading
 import time
 from typing import Optional, Callable, Dict, ClassVar, Literal, List
-from functools import wraps
-from pathlib import Path
+from functools import lru_cache, wraps
 from dotenv import load_dotenv
-from httpx import request
+import httpx
 import logging
 
 logging.getLogger("httpx").setLevel(logging.NOTSET) # Suprime os logs do httpx
 
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+try:
+    # Dependência opcional (somente Linux): leitura via io_uring quando disponível
+    import liburing
+    _HAS_LIBURING = True
+except ImportError:
+    _HAS_LIBURING = False
 
-class LogFileMonitor(FileSystemEventHandler):
+try:
+    # Dependência opcional: serialização JSON em C, bem mais rápida que a stdlib
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
+try:
+    # Dependência opcional: compressão dos lotes grandes antes do envio
+    import zstandard
+    _HAS_ZSTD = True
+except ImportError:
+    _HAS_ZSTD = False
+
+try:
+    # Dependência opcional do httpx: HTTP/2 só quando o pacote h2 está instalado
+    import h2
+    _HAS_H2 = True
+except ImportError:
+    _HAS_H2 = False
+
+_HAS_PREADV = hasattr(os, "preadv")  # Indisponível no Windows
+
+class LogFileMonitor:
     """Classe para monitorar o arquivo de log e enviar os logs para o LogStream API"""
-    def __init__(self, log_file, callback):
+
+    _READ_CHUNK: ClassVar[int] = 65536
+    """Tamanho do bloco de leitura em bytes"""
+
+    _RING_SIZE: ClassVar[int] = 4096
+    """Capacidade do anel de linhas (potência de dois, para indexar com máscara)"""
+
+    _MAX_LINE_LEN: ClassVar[int] = 16384
+    """Tamanho máximo de uma linha em bytes; o excedente é truncado"""
+
+    def __init__(self, log_file):
         self.log_file = log_file
-        self.callback = callback
+        self._log_file_str = str(log_file)  # Calculado uma vez, fora do caminho quente
+        self._fd = os.open(self._log_file_str, os.O_RDONLY)
+        self._ino = os.fstat(self._fd).st_ino  # Para detectar rotação do arquivo
         self._last_position = 0
-        self._buffer: List[str] = []
-
-    def on_modified(self, event):
-        """Evento que é chamado quando o arquivo de log é modificado"""
-        if event.src_path == str(self.log_file):
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                f.seek(self._last_position)
-                new_lines = f.readlines()
-                self._last_position = f.tell()
-                for line in new_lines:
-                    line = line.strip()
-                    if line:
-                        self._buffer.append(line)
-
-    def get_buffer(self) -> List[str]:
-        """Retorna o buffer atual e limpa-o"""
-        buffer = self._buffer.copy()
-        self._buffer.clear()
+        self._read_buf = bytearray(self._READ_CHUNK)  # Bloco de leitura pré-alocado
+        self._read_buf_mv = memoryview(self._read_buf)  # Visão reutilizada nas leituras
+        self._residual = bytearray()  # Linha incompleta entre leituras
+        # Anel SPSC de capacidade fixa: head só é escrito pelo produtor (poll)
+        # e tail só pelo consumidor (get_buffer), sem necessidade de lock
+        self._ring: List[Optional[bytes]] = [None] * self._RING_SIZE
+        self._head = 0
+        self._tail = 0
+        self._uring = None
+        if _HAS_LIBURING:
+            self._init_uring()
+
+    def _init_uring(self) -> None:
+        """Prepara a fila io_uring para as leituras; em falha, mantém o preadv"""
+        try:
+            uring = liburing.io_uring()
+            try:
+                liburing.io_uring_queue_init(8, uring, liburing.IORING_SETUP_SQPOLL)
+            except OSError:
+                # SQPOLL exige privilégio em kernels antigos; segue sem ele
+                liburing.io_uring_queue_init(8, uring, 0)
+            self._uring_cqe = liburing.io_uring_cqe()
+            self._uring_iov = liburing.iovec(self._read_buf)
+            self._uring = uring
+            self._uring_fixed = False
+            self._register_uring_file()
+        except Exception:
+            self._uring = None
+
+    def _register_uring_file(self) -> None:
+        """(Re)registra o fd na tabela de arquivos fixos do io_uring"""
+        try:
+            if self._uring_fixed:
+                liburing.io_uring_unregister_files(self._uring)
+                self._uring_fixed = False
+            liburing.io_uring_register_files(self._uring, [self._fd])
+            self._uring_fixed = True
+        except Exception:
+            # Sem registro, as SQEs continuam referenciando o fd pelo número
+            self._uring_fixed = False
+
+    def _read_chunk(self, offset: int) -> int:
+        """Lê um bloco do arquivo a partir do offset para o buffer pré-alocado"""
+        if self._uring is not None:
+            sqe = liburing.io_uring_get_sqe(self._uring)
+            if self._uring_fixed:
+                # Fd registrado: a SQE usa o índice 0 da tabela de arquivos fixos
+                liburing.io_uring_prep_readv(sqe, 0, self._uring_iov, 1, offset)
+                sqe.flags |= liburing.IOSQE_FIXED_FILE
+            else:
+                liburing.io_uring_prep_readv(sqe, self._fd, self._uring_iov, 1, offset)
+            liburing.io_uring_submit(self._uring)
+            liburing.io_uring_wait_cqe(self._uring, self._uring_cqe)
+            n = liburing.trap_error(self._uring_cqe.res)
+            liburing.io_uring_cqe_seen(self._uring, self._uring_cqe)
+            return n
+        if _HAS_PREADV:
+            return os.preadv(self._fd, [self._read_buf_mv], offset)
+        # Fallback (Windows): par lseek+read no mesmo fd persistente
+        os.lseek(self._fd, offset, os.SEEK_SET)
+        data = os.read(self._fd, self._READ_CHUNK)
+        self._read_buf_mv[:len(data)] = data
+        return len(data)
+
+    def poll(self) -> None:
+        """Verifica se o arquivo cresceu e acumula as linhas novas no buffer"""
+        try:
+            st = os.stat(self._log_file_str)
+        except FileNotFoundError:
+            return  # Janela de rotação: espera o arquivo novo aparecer
+
+        if st.st_ino != self._ino:
+            # Rotação: reabre o arquivo novo e recomeça do início
+            os.close(self._fd)
+            self._fd = os.open(self._log_file_str, os.O_RDONLY)
+            self._ino = st.st_ino
+            if self._uring is not None:
+                self._register_uring_file()
+            self._last_position = 0
+            self._residual.clear()
+        elif st.st_size < self._last_position:
+            # Arquivo truncado no lugar (rotação copytruncate)
+            self._last_position = 0
+            self._residual.clear()
+
+        size = st.st_size
+        # A leitura parte direto do offset, dispensando o par lseek+read por bloco
+        while self._last_position < size:
+            n = self._read_chunk(self._last_position)
+            if n <= 0:
+                break
+            self._last_position += n
+            self._residual += self._read_buf_mv[:n]
+
+        # Processa mesmo sem bytes novos: linhas podem ter ficado no resíduo
+        # num tick em que o anel encheu
+        self._parse_residual()
+
+    def _parse_residual(self) -> None:
+        """Enfileira no anel as linhas completas do resíduo, até onde couber"""
+        # Só processa até a última quebra de linha; o resto fica para a próxima leitura
+        end = self._residual.rfind(b"\n")
+        if end < 0:
+            return
+
+        mask = self._RING_SIZE - 1
+        consumed = 0
+        for raw in bytes(memoryview(self._residual)[:end]).split(b"\n"):
+            raw_len = len(raw) + 1  # O trecho consumido inclui o \n
+            if not raw:
+                consumed += raw_len
+                continue
+            # Só aloca um novo objeto no strip se a linha realmente tem
+            # espaço/controle nas bordas (todos os bytes de espaço são <= 0x20)
+            if raw[0] <= 0x20 or raw[-1] <= 0x20:
+                raw = raw.strip()
+                if not raw:
+                    consumed += raw_len
+                    continue
+
+            nxt = (self._head + 1) & mask
+            if nxt == self._tail:
+                # Anel cheio: o excedente permanece no resíduo e volta a ser
+                # processado no próximo tick, depois do dreno do consumidor
+                break
+
+            # A linha segue como bytes; a decodificação fica para a hora do envio
+            if len(raw) > self._MAX_LINE_LEN:
+                raw = raw[:self._MAX_LINE_LEN]
+            self._ring[self._head] = raw
+            self._head = nxt
+            consumed += raw_len
+        del self._residual[:consumed]
+
+    def get_buffer(self) -> List[bytes]:
+        """Drena o anel e retorna as linhas acumuladas, ainda como bytes"""
+        mask = self._RING_SIZE - 1
+        buffer: List[bytes] = []
+        while self._tail != self._head:
+            buffer.append(self._ring[self._tail])
+            self._ring[self._tail] = None
+            self._tail = (self._tail + 1) & mask
         return buffer
 
+    def close(self) -> None:
+        """Fecha o descritor do arquivo de log e a fila io_uring, se ativa"""
+        if self._uring is not None:
+            liburing.io_uring_queue_exit(self._uring)
+            self._uring = None
+        os.close(self._fd)
+
+@lru_cache(maxsize=8)
+def _load_env(path: str, mtime: float) -> None:
+    """Carrega o arquivo de configuração uma vez; o mtime na chave invalida o cache"""
+    load_dotenv(path, override=True)
+
 class Config:
     """Configurações do LogStream"""
     
     ConfigKeys = Literal["AUTOMATION_ID", "AUTOMATION_NAME", "LOG_FILE"]
     """Tipagem para as chaves do arquivo de configuração"""
 
-    _project_path: Path = Path.cwd() # Sempre será o diretório do projeto
+    _project_path: str = os.getcwd() # Sempre será o diretório do projeto
 
-    _observer: ClassVar[Optional[Observer]] = None
     _handler: ClassVar[Optional[LogFileMonitor]] = None
 
     _api_url: ClassVar[str] = "https://dclick-logstream.insidev.com.br"
     _env_file_name: ClassVar[str] = ".logstream"
-    _log_file: ClassVar[Path] = _project_path / ".log"
+    _log_file: ClassVar[str] = os.path.join(_project_path, ".log")
     _automation_id: ClassVar[Optional[str]]
     _automation_name: ClassVar[Optional[str]]
-    _env_file: ClassVar[Path] = _project_path / _env_file_name
+    _send_path: ClassVar[str]
+    _clear_path: ClassVar[str]
+    _env_file: ClassVar[str] = os.path.join(_project_path, _env_file_name)
 
     _default_env_config: ClassVar[Dict[str, str]] = {
         "AUTOMATION_ID": "",
         "AUTOMATION_NAME": "",
-        "LOG_FILE": str(_project_path / _log_file)
+        "LOG_FILE": _log_file
     }
 
+    _validated: ClassVar[bool] = False
+    """Indica que a configuração já foi carregada e validada neste processo"""
+
     def __init_subclass__(cls) -> None:
         """Inicializa a configuração quando a classe é herdada."""
         cls._ensure_config()
@@ -70,22 +251,35 @@ class Config:
     @classmethod
     def _ensure_config(cls) -> None:
         """Verifica e cria o arquivo de configuração se necessário."""
-        if not cls._env_file.exists():
+        if Config._validated:
+            return
+
+        if not os.path.exists(cls._env_file):
             with open(cls._env_file, "w") as f:
                 for key, value in cls._default_env_config.items():
                     f.write(f"{key}={value}\n")
             print(f"Arquivo .logstream criado em: {cls._env_file}")
         
-        load_dotenv(cls._env_file, override=True)
+        _load_env(cls._env_file, os.path.getmtime(cls._env_file))
         
         current_automation_id = cls.get_config("AUTOMATION_ID")
         current_automation_name = cls.get_config("AUTOMATION_NAME")
 
-        cls._automation_id = current_automation_id
-        cls._automation_name = current_automation_name
+        # Guardados na própria Config: com a validação única, qualquer subclasse
+        # definida depois herda os valores já carregados
+        Config._automation_id = current_automation_id
+        Config._automation_name = current_automation_name
+
+        # Caminhos dos endpoints montados uma única vez, fora do caminho de envio
+        Config._send_path = f"/batch/{current_automation_id}"
+        Config._clear_path = f"/logs/{current_automation_id}/clear"
+
+        # Exceção explícita: assert seria silenciado ao rodar com python -O
+        if not current_automation_id or not current_automation_name:
+            raise RuntimeError("Para usar o LogStream, insira o ID e o nome da automação no arquivo de configuração.")
+
+        Config._validated = True
 
-        assert None not in (current_automation_id, current_automation_name), "Para usar o LogStream, insira o ID e o nome da automação no arquivo de configuração."
-        
     @classmethod
     def get_config(cls, key: ConfigKeys) -> Optional[str]:
         """Retorna as configurações do arquivo de configuração."""
@@ -98,40 +292,194 @@ class Config:
 class LogStream(Config):
     """Classe de streaming de logs para o LogStream API."""
 
+    _client: ClassVar[Optional[httpx.AsyncClient]] = None
+    """Cliente HTTP persistente, reutiliza as conexões entre os envios"""
+
+    _max_chunk_lines: ClassVar[int] = 1024
+    """Máximo de linhas por POST; lotes maiores são divididos e enviados em paralelo"""
+
+    _max_batch_lines: ClassVar[int] = 1024
+    """Quantidade de linhas pendentes que força um envio imediato"""
+
+    _max_batch_latency: ClassVar[float] = 5.0
+    """Tempo máximo (em segundos) que uma linha pode esperar no lote antes do envio"""
+
+    _send_buf: ClassVar[bytearray] = bytearray()
+    """Buffer de serialização reutilizado entre os envios"""
+
+    _json_headers: ClassVar[Dict[str, str]] = {"Content-Type": "application/json"}
+
+    _zstd_headers: ClassVar[Dict[str, str]] = {"Content-Type": "application/json", "Content-Encoding": "zstd"}
+
+    _compress_threshold: ClassVar[int] = 8192
+    """Tamanho do corpo (em bytes) a partir do qual o lote é comprimido"""
+
+    _zstd_compressor: ClassVar = zstandard.ZstdCompressor(level=3) if _HAS_ZSTD else None
+    """Compressor reutilizado entre os envios; nível baixo prioriza velocidade"""
+
+    _max_send_retries: ClassVar[int] = 3
+    """Quantidade de retentativas de envio antes de desistir do lote"""
+
+    _retry_backoff_base: ClassVar[float] = 0.5
+    """Espera inicial (em segundos) entre as retentativas; dobra a cada tentativa"""
+
+    _retry_backoff_cap: ClassVar[float] = 8.0
+    """Espera máxima (em segundos) entre as retentativas"""
+
     @classmethod
-    def send_logs(cls, logs: List[str]) -> Dict[str, str]:
+    async def _post_with_retry(cls, body: bytes) -> None:
+        """Envia um corpo já serializado, retentando com backoff exponencial"""
+        headers = cls._json_headers
+        if _HAS_ZSTD and len(body) > cls._compress_threshold:
+            body = cls._zstd_compressor.compress(body)
+            headers = cls._zstd_headers
+
+        for attempt in range(cls._max_send_retries + 1):
+            try:
+                response = await cls._client.post(cls._send_path, content=body, headers=headers)
+                # Só retenta quando faz sentido: limite de taxa ou erro do servidor
+                if response.status_code != 429 and response.status_code < 500:
+                    return
+                if attempt == cls._max_send_retries:
+                    raise RuntimeError(f"Envio de logs falhou com status {response.status_code}")
+            except httpx.TransportError:
+                if attempt == cls._max_send_retries:
+                    raise
+            wait = min(cls._retry_backoff_cap, cls._retry_backoff_base * 2 ** attempt)
+            await asyncio.sleep(wait + random.random() * 0.1)  # Jitter evita retentativas em sincronia
+
+    @classmethod
+    def _coalesce(cls, logs: List[bytes]) -> List[List]:
+        """Agrupa linhas idênticas consecutivas em pares (linha, repetições)"""
+        out: List[List] = []
+        for line in logs:
+            if out and out[-1][0] == line:
+                out[-1][1] += 1
+            else:
+                out.append([line, 1])
+        return out
+
+    @classmethod
+    def _serialize_batch(cls, entries: List[List]) -> bytes:
+        """Serializa o lote no buffer reutilizável e retorna o corpo do POST"""
+        # Decodificação adiada até aqui; "replace" cobre o corte de linhas truncadas.
+        # Linhas repetidas em sequência viram um objeto {"log", "n"} no lugar de N cópias
+        payload = {
+            "logs": [
+                line.decode("utf-8", "replace") if n == 1
+                else {"log": line.decode("utf-8", "replace"), "n": n}
+                for line, n in entries
+            ],
+            "automation_id": cls._automation_id,
+        }
+        cls._send_buf.clear()
+        if _HAS_ORJSON:
+            cls._send_buf += orjson.dumps(payload)
+        else:
+            cls._send_buf += json.dumps(payload).encode("utf-8")
+        return bytes(cls._send_buf)
+
+    @classmethod
+    async def send_logs(cls, logs: List[bytes]) -> Dict[str, str]:
         """Envia uma lista de logs para o LogStream API"""
         if not logs:
             return {}
-        
-        data = {
-            "logs": logs,
-            "automation_id": cls._automation_id
-        }
-        request(method="POST", url=f"{cls._api_url}/batch/{cls._automation_id}", json=data)
+
+        # Lotes grandes são divididos e enviados em paralelo na mesma conexão.
+        # O corpo já vai serializado (content=) para o httpx não repetir o json.dumps
+        entries = cls._coalesce(logs)
+        chunks = [entries[i:i + cls._max_chunk_lines] for i in range(0, len(entries), cls._max_chunk_lines)]
+        bodies = [cls._serialize_batch(chunk) for chunk in chunks]
+        await asyncio.gather(*[cls._post_with_retry(body) for body in bodies])
 
     @classmethod
-    def clear_buffer(cls) -> Dict[str, str]:
+    async def clear_buffer(cls) -> Dict[str, str]:
         """Limpa o buffer inicial."""
-        request(method="POST", url=f"{cls._api_url}/logs/{cls._automation_id}/clear")
+        await cls._client.post(cls._clear_path)
 
     _check_interval: ClassVar[float] = 5.0  # Intervalo de verificação em segundos
     _is_running: ClassVar[bool] = False
     _thread: ClassVar[Optional[threading.Thread]] = None
-    _last_position: ClassVar[int] = 0
+    _loop: ClassVar[Optional[asyncio.AbstractEventLoop]] = None
+    _stop_event: ClassVar[Optional[asyncio.Event]] = None
 
     @classmethod
-    def _monitor_thread(cls) -> None:
-        """Thread que monitora e envia os logs periodicamente"""
-        while cls._is_running:
-            if cls._handler:
-                logs = cls._handler.get_buffer()
-                if logs:
+    async def _monitor_coro(cls) -> None:
+        """Corrotina que monitora e envia os logs periodicamente"""
+        cls._client = httpx.AsyncClient(
+            base_url=cls._api_url,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            http2=_HAS_H2,
+        )
+        cls._stop_event = asyncio.Event()
+        try:
+            # Limpa o buffer inicial
+            try:
+                await cls.clear_buffer()
+            except Exception as e:
+                print(f"Erro ao limpar o buffer: {e}")
+
+            # Acumula as linhas e só envia quando o lote enche ou a latência estoura,
+            # amortizando o custo de cada POST sobre muitas linhas
+            pending: List[bytes] = []
+            last_flush = time.monotonic()
+            while cls._is_running:
+                if cls._handler:
+                    # Erro de leitura não pode derrubar a thread de monitoramento
+                    try:
+                        cls._handler.poll()
+                        pending.extend(cls._handler.get_buffer())
+                    except Exception as e:
+                        print(f"Erro ao ler o arquivo de log: {e}")
+
+                now = time.monotonic()
+                if pending and (len(pending) >= cls._max_batch_lines
+                                or now - last_flush >= cls._max_batch_latency):
                     try:
-                        cls.send_logs(logs)
+                        await cls.send_logs(pending)
                     except Exception as e:
                         print(f"Erro ao enviar logs: {e}")
-            time.sleep(cls._check_interval)
+                    pending = []
+                    last_flush = now
+
+                # Espera cancelável: stop() acorda o loop na hora, sem esperar o tick
+                try:
+                    await asyncio.wait_for(cls._stop_event.wait(), timeout=cls._check_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            # Drena o arquivo uma última vez: as linhas escritas entre o último
+            # tick e o stop() ainda não passaram pelo poll
+            if cls._handler:
+                try:
+                    cls._handler.poll()
+                    pending.extend(cls._handler.get_buffer())
+                except Exception as e:
+                    print(f"Erro ao ler o arquivo de log: {e}")
+
+            # Envia o que sobrou no lote antes de encerrar
+            if pending:
+                try:
+                    await cls.send_logs(pending)
+                except Exception as e:
+                    print(f"Erro ao enviar logs: {e}")
+        finally:
+            await cls._client.aclose()
+            cls._client = None
+            cls._stop_event = None
+
+    @classmethod
+    def _monitor_thread(cls) -> None:
+        """Thread que roda o loop de eventos dedicado do monitoramento"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        cls._loop = loop
+        try:
+            loop.run_until_complete(cls._monitor_coro())
+        finally:
+            cls._loop = None
+            loop.close()
 
     @classmethod
     def start(cls) -> None:
@@ -139,14 +487,8 @@ class LogStream(Config):
         if not os.path.exists(cls._log_file):
             raise FileNotFoundError(f"Arquivo de log não encontrado: {cls._log_file}")
 
-        # Limpa o buffer inicial
-        cls.clear_buffer()
+        cls._handler = LogFileMonitor(cls._log_file)
 
-        cls._handler = LogFileMonitor(cls._log_file, lambda x: None)  # Callback vazio pois agora usamos o buffer
-        cls._observer = Observer()
-        cls._observer.schedule(cls._handler, path=str(Path(cls._log_file).parent), recursive=False)
-        cls._observer.start()
-        
         cls._is_running = True
         cls._thread = threading.Thread(target=cls._monitor_thread)
         cls._thread.start()
@@ -155,13 +497,13 @@ class LogStream(Config):
     def stop(cls) -> None:
         """Interrompe o streaming de logs"""
         cls._is_running = False
+        if cls._loop and cls._stop_event:
+            cls._loop.call_soon_threadsafe(cls._stop_event.set)
         if cls._thread:
             cls._thread.join()
             cls._thread = None
-        if cls._observer:
-            cls._observer.stop()
-            cls._observer.join()
-            cls._observer = None
+        if cls._handler:
+            cls._handler.close()
             cls._handler = None
 
     @classmethod